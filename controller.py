@@ -4,15 +4,23 @@ A Kopf-based operator that watches Kubernetes workloads and automatically
 restarts them when container image digests change.
 """
 
+import asyncio
 import datetime
+import functools
 import os
-from dataclasses import dataclass
-from typing import Protocol, Optional
+import re
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping, Protocol, Optional
 from enum import Enum
 
+import httpx
 import kopf
 import kubernetes
-import requests
 from kubernetes.config import ConfigException
 
 
@@ -20,19 +28,19 @@ class Config:
     """Application configuration."""
 
     # Annotations
-    ENABLE_ANNOTATION = "image-updater.eznix86.github.io/enabled"
-    LAST_DIGEST_ANNOTATION = "image-updater.eznix86.github.io/last-digest"
-    TRACK_CONTAINERS_ANNOTATION = "image-updater.eznix86.github.io/track-containers"
-    IGNORE_CONTAINERS_ANNOTATION = "image-updater.eznix86.github.io/ignore-containers"
-    TRACK_INIT_CONTAINERS_ANNOTATION = (
-        "image-updater.eznix86.github.io/track-init-containers"
-    )
+    ANNOTATION_PREFIX = "image-updater.eznix86.github.io/"
+    ENABLE_ANNOTATION = ANNOTATION_PREFIX + "enabled"
+    LAST_DIGEST_ANNOTATION = ANNOTATION_PREFIX + "last-digest"
+    TRACK_CONTAINERS_ANNOTATION = ANNOTATION_PREFIX + "track-containers"
+    IGNORE_CONTAINERS_ANNOTATION = ANNOTATION_PREFIX + "ignore-containers"
+    TRACK_INIT_CONTAINERS_ANNOTATION = ANNOTATION_PREFIX + "track-init-containers"
     RESTART_ANNOTATION = "kubectl.kubernetes.io/restartedAt"
 
     # Defaults
     DEFAULT_INTERVAL = 300
     DEFAULT_REGISTRY = "registry-1.docker.io"
     DEFAULT_NAMESPACE = "library"
+    DEFAULT_TAG = "latest"
 
     # Environment
     CHECK_INTERVAL = int(os.getenv("CHECK_INTERVAL", str(DEFAULT_INTERVAL)))
@@ -41,70 +49,129 @@ class Config:
         == "true"
     )
 
-    OCI_ACCEPT_TYPES = [
+    # Digest cache
+    DIGEST_CACHE_TTL = max(30, CHECK_INTERVAL // 2)
+    DIGEST_CACHE_SIZE = 1024
+
+    # Bearer tokens
+    TOKEN_DEFAULT_TTL = 60
+    TOKEN_EXPIRY_MARGIN = 30
+    TOKEN_CACHE_SIZE = 256
+
+    OCI_ACCEPT_TYPES = (
         "application/vnd.oci.image.manifest.v1+json",
         "application/vnd.docker.distribution.manifest.v2+json",
         "application/vnd.oci.image.index.v1+json",
         "application/vnd.docker.distribution.manifest.list.v2+json",
-    ]
+    )
+    OCI_ACCEPT_HEADER = ", ".join(OCI_ACCEPT_TYPES)
 
+    @staticmethod
+    def owns_annotation(key: str) -> bool:
+        """Check whether an annotation belongs to this controller."""
+        return key.startswith(Config.ANNOTATION_PREFIX)
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class ImageReference:
     """Parsed container image reference."""
 
     registry: str
     repository: str
     tag: str
+    digest: Optional[str] = None
 
     @classmethod
+    @functools.lru_cache(maxsize=4096)
     def parse(cls, image: str) -> "ImageReference":
-        """Parse image string into components.
+        """Parse image string into components in a single left-to-right scan.
+
+        References are immutable, so results are memoized per image string.
 
         Examples:
             nginx:latest -> registry-1.docker.io/library/nginx:latest
             myregistry.io/app:v1 -> myregistry.io/app:v1
+            localhost:5000/app -> localhost:5000/app:latest
+            nginx@sha256:abc -> registry-1.docker.io/library/nginx@sha256:abc
         """
-        name, tag = image.rsplit(":", 1)
+        # First path component is a registry if it looks like a host
+        slash = image.find("/")
+        if slash != -1 and (
+            image.find(".", 0, slash) != -1
+            or image.find(":", 0, slash) != -1
+            or image.startswith("localhost/")
+        ):
+            registry = image[:slash]
+            start = slash + 1
+        else:
+            registry = Config.DEFAULT_REGISTRY
+            start = 0
 
-        # Handle Docker Hub shorthand
-        if "/" not in name:
-            return cls(
-                registry=Config.DEFAULT_REGISTRY,
-                repository=f"{Config.DEFAULT_NAMESPACE}/{name}",
-                tag=tag,
-            )
+        # Optional digest suffix
+        end = image.find("@", start)
+        digest = None
+        if end != -1:
+            digest = image[end + 1 :]
+        else:
+            end = len(image)
 
-        # Check if first part is a registry (contains . or :)
-        first_part = name.split("/")[0]
-        if "." in first_part or ":" in first_part:
-            registry, repository = name.split("/", 1)
+        # Repository paths cannot contain ':', so any colon left separates the tag
+        colon = image.find(":", start, end)
+        if colon != -1:
+            repository = image[start:colon]
+            tag = image[colon + 1 : end]
         else:
-            registry = Config.DEFAULT_REGISTRY
-            repository = name
+            repository = image[start:end]
+            tag = Config.DEFAULT_TAG
 
-        return cls(registry=registry, repository=repository, tag=tag)
+        if not repository or not tag or digest == "":
+            raise ValueError(f"Invalid image reference: {image!r}")
 
+        # Handle Docker Hub shorthand
+        if slash == -1:
+            repository = f"{Config.DEFAULT_NAMESPACE}/{repository}"
+
+        # The same registries, repositories and tags recur across the cluster
+        return cls(
+            registry=sys.intern(registry),
+            repository=sys.intern(repository),
+            tag=sys.intern(tag),
+            digest=digest,
+        )
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class ContainerInfo:
     """Information about a tracked container."""
 
     name: str
     image: str
     image_pull_policy: Optional[str] = None
+    # Whether imagePullPolicy needs to be set to Always
+    needs_pull_policy_update: bool = field(init=False, repr=False, compare=False)
 
-    @property
-    def needs_pull_policy_update(self) -> bool:
-        """Check if imagePullPolicy needs to be set to Always."""
-        return self.image_pull_policy != "Always"
+    def __post_init__(self) -> None:
+        object.__setattr__(
+            self, "needs_pull_policy_update", self.image_pull_policy != "Always"
+        )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DigestMap:
     """Container name to digest mapping."""
 
-    digests: dict[str, str]
+    digests: Mapping[str, str]
+    items: tuple[tuple[str, str], ...] = field(init=False, repr=False, compare=False)
+    _annotation: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # Read-only copy, so the precomputed fields below can't drift from it
+        object.__setattr__(self, "digests", MappingProxyType(dict(self.digests)))
+        items = tuple(sorted(self.digests.items()))
+        object.__setattr__(self, "items", items)
+        object.__setattr__(
+            self, "_annotation", ",".join(f"{name}:{digest}" for name, digest in items)
+        )
 
     @classmethod
     def from_annotation(cls, annotation_value: Optional[str]) -> "DigestMap":
@@ -123,40 +190,48 @@ class DigestMap:
         ):
             return cls({"__legacy__": annotation_value})
 
-        # Parse new format
+        # Parse new format in one pass, slicing entries out by index
         digests = {}
-        for entry in annotation_value.split(","):
-            entry = entry.strip()
-            if ":" not in entry:
-                continue
+        start, end = 0, len(annotation_value)
+        while start < end:
+            comma = annotation_value.find(",", start)
+            if comma == -1:
+                comma = end
 
-            name, digest = entry.split(":", 1)
-            name, digest = name.strip(), digest.strip()
+            colon = annotation_value.find(":", start, comma)
+            if colon != -1:
+                name = annotation_value[start:colon].strip()
+                digest = annotation_value[colon + 1 : comma].strip()
+                if name and digest:
+                    digests[name] = digest
 
-            if name and digest:
-                digests[name] = digest
+            start = comma + 1
 
         return cls(digests)
 
     def to_annotation(self) -> str:
         """Convert digest map to annotation string."""
-        return ",".join(
-            f"{name}:{digest}" for name, digest in sorted(self.digests.items())
-        )
+        return self._annotation
 
     def has_changed(self, current: "DigestMap") -> bool:
         """Check if any digests have changed or containers added/removed."""
+        # Serialized forms are precomputed, so the common case is one string compare
+        if self._annotation == current._annotation:
+            return False
+
+        # With no more stored entries than current ones, unequal maps must
+        # include a new or changed container
+        if len(self.items) <= len(current.items):
+            return True
+
+        stored = set(self.items)
+
         # Check for new or changed containers
-        for name, digest in current.digests.items():
-            if self.digests.get(name) != digest:
-                return True
+        if not stored.issuperset(current.items):
+            return True
 
         # Check for removed containers
-        for name in self.digests:
-            if name not in current.digests and name != "__legacy__":
-                return True
-
-        return False
+        return any(name != "__legacy__" for name, _ in stored.difference(current.items))
 
     def migrate_legacy(self, primary_container: str) -> "DigestMap":
         """Migrate legacy single-digest format to new format."""
@@ -165,6 +240,15 @@ class DigestMap:
         return self
 
 
+@dataclass(frozen=True)
+class WorkloadSnapshot:
+    """Parsed pod template of a workload, built once per watch event."""
+
+    containers: tuple[ContainerInfo, ...]
+    init_containers: tuple[ContainerInfo, ...]
+    annotations: dict[str, str]
+
+
 class WorkloadKind(str, Enum):
     """Supported Kubernetes workload types."""
 
@@ -199,17 +283,103 @@ class Logger(Protocol):
     def error(self, msg: str) -> None: ...
 
 
+def create_http_session() -> httpx.AsyncClient:
+    """Create a pooled HTTP/2 client for registry and token endpoints."""
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        follow_redirects=True,
+    )
+
+
+# Shared across all registry calls so lookups multiplex over long-lived connections
+_SESSION = create_http_session()
+
+# Blocking Kubernetes API patches run here so they never stall kopf's event loop
+_PATCH_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="patch")
+
+
 class ImageRegistry:
     """Handles interaction with container registries."""
 
-    def __init__(self, timeout: int = 10):
+    # key="quoted value" or key=token; quoted values may contain commas
+    _AUTH_PARAM_RE = re.compile(r'(\w+)\s*=\s*(?:"([^"]*)"|([^\s,"]*))')
+
+    def __init__(self, timeout: int = 10, session: Optional[httpx.AsyncClient] = None):
         self.timeout = timeout
-        self.session = requests.Session()
+        self.session = session if session is not None else _SESSION
+        # (fetched_at, digest, etag) per tag; the ETag outlives the TTL so
+        # expired entries can be revalidated with a conditional request
+        self._cache: OrderedDict[
+            tuple[str, str, str], tuple[float, str, Optional[str]]
+        ] = OrderedDict()
+        self._cache_ttl = Config.DIGEST_CACHE_TTL
+        self._inflight: dict[tuple[str, str, str], asyncio.Task] = {}
+        # (registry, scope) -> (token, expires_at)
+        self._tokens: OrderedDict[tuple[str, str], tuple[str, float]] = OrderedDict()
+
+    def cached_digest(self, image_ref: ImageReference) -> Optional[str]:
+        """Return the digest for an image if it is known without a registry request."""
+        if image_ref.digest:
+            return image_ref.digest
+
+        key = (image_ref.registry, image_ref.repository, image_ref.tag)
+
+        cached = self._cache.get(key)
+        if cached and time.monotonic() - cached[0] < self._cache_ttl:
+            self._cache.move_to_end(key)
+            return cached[1]
+
+        return None
+
+    async def get_digest(self, image_ref: ImageReference) -> str:
+        """Fetch content digest for an image, served from cache while fresh.
+
+        Concurrent lookups of the same tag share a single registry request.
+        """
+        if (digest := self.cached_digest(image_ref)) is not None:
+            return digest
+
+        key = (image_ref.registry, image_ref.repository, image_ref.tag)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_and_cache(key, image_ref))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # Shielded so one cancelled caller doesn't abort the lookup for the others
+        return await asyncio.shield(task)
+
+    async def _fetch_and_cache(
+        self, key: tuple[str, str, str], image_ref: ImageReference
+    ) -> str:
+        """Fetch a digest from the registry and store it in the cache."""
+        stale = self._cache.get(key)
+        digest, etag = await self._fetch_digest(image_ref, stale[1:] if stale else None)
+
+        self._cache[key] = (time.monotonic(), digest, etag)
+        self._cache.move_to_end(key)
+        if len(self._cache) > Config.DIGEST_CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+        return digest
 
-    def get_digest(self, image_ref: ImageReference) -> str:
-        """Fetch content digest for an image."""
+    async def _fetch_digest(
+        self,
+        image_ref: ImageReference,
+        stale: Optional[tuple[str, Optional[str]]] = None,
+    ) -> tuple[str, Optional[str]]:
+        """Fetch content digest and ETag for an image from its registry.
+
+        A stale ``(digest, etag)`` pair is revalidated with ``If-None-Match``
+        and reused as-is when the registry answers ``304 Not Modified``.
+        """
+        etag = stale[1] if stale else None
         try:
-            response = self._fetch_manifest(image_ref)
+            response = await self._fetch_manifest(image_ref, etag)
+            if etag and response.status_code == 304:
+                return stale
+
             digest = response.headers.get("Docker-Content-Digest")
 
             if not digest:
@@ -217,33 +387,51 @@ class ImageRegistry:
                     f"No digest header returned for {image_ref.repository}:{image_ref.tag}"
                 )
 
-            return digest
+            return digest, response.headers.get("ETag")
 
-        except requests.RequestException as e:
+        except (httpx.HTTPError, httpx.InvalidURL) as e:
             raise DigestFetchError(f"Failed to fetch manifest: {e}") from e
 
-    def _fetch_manifest(self, image_ref: ImageReference) -> requests.Response:
-        """Fetch manifest with authentication handling."""
-        headers = {"Accept": ", ".join(Config.OCI_ACCEPT_TYPES)}
+    async def _fetch_manifest(
+        self, image_ref: ImageReference, etag: Optional[str] = None
+    ) -> httpx.Response:
+        """Fetch manifest headers with authentication handling."""
+        headers = {"Accept": Config.OCI_ACCEPT_HEADER}
+        if etag:
+            headers["If-None-Match"] = etag
         url = f"https://{image_ref.registry}/v2/{image_ref.repository}/manifests/{image_ref.tag}"
+        token_key = (image_ref.registry, f"repository:{image_ref.repository}:pull")
+
+        # A still-valid token skips the 401 challenge round trip entirely
+        cached = self._tokens.get(token_key)
+        if cached and time.monotonic() < cached[1]:
+            self._tokens.move_to_end(token_key)
+            headers["Authorization"] = f"Bearer {cached[0]}"
+        elif cached:
+            del self._tokens[token_key]
 
-        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        # HEAD returns the same Docker-Content-Digest header without the body
+        response = await self.session.head(url, headers=headers, timeout=self.timeout)
 
         if response.status_code == 401:
-            token = self._get_bearer_token(
-                response.headers.get("WWW-Authenticate"), image_ref.repository
+            self._tokens.pop(token_key, None)
+            token = await self._get_bearer_token(
+                response.headers.get("WWW-Authenticate"), token_key
             )
             if token:
                 headers["Authorization"] = f"Bearer {token}"
-                response = self.session.get(url, headers=headers, timeout=self.timeout)
+                response = await self.session.head(
+                    url, headers=headers, timeout=self.timeout
+                )
 
-        response.raise_for_status()
+        if response.status_code != 304:
+            response.raise_for_status()
         return response
 
-    def _get_bearer_token(
-        self, auth_header: Optional[str], repository: str
+    async def _get_bearer_token(
+        self, auth_header: Optional[str], token_key: tuple[str, str]
     ) -> Optional[str]:
-        """Request bearer token from registry."""
+        """Request bearer token from registry and cache it until it expires."""
         if not auth_header:
             return None
 
@@ -253,19 +441,39 @@ class ImageRegistry:
         if not realm:
             return None
 
-        query = {"scope": params.get("scope", f"repository:{repository}:pull")}
+        query = {"scope": params.get("scope", token_key[1])}
 
         if service := params.get("service"):
             query["service"] = service
 
         try:
-            response = requests.get(realm, params=query, timeout=self.timeout)
+            response = await self.session.get(realm, params=query, timeout=self.timeout)
             response.raise_for_status()
             data = response.json()
-            return data.get("token") or data.get("access_token")
-        except requests.RequestException:
+            token = data.get("token") or data.get("access_token")
+        except (httpx.HTTPError, httpx.InvalidURL, ValueError, TypeError):
             return None
 
+        if token:
+            expires_in = self._token_ttl(data.get("expires_in"))
+            self._tokens[token_key] = (
+                token,
+                time.monotonic() + expires_in - Config.TOKEN_EXPIRY_MARGIN,
+            )
+            self._tokens.move_to_end(token_key)
+            if len(self._tokens) > Config.TOKEN_CACHE_SIZE:
+                self._tokens.popitem(last=False)
+        return token
+
+    @staticmethod
+    def _token_ttl(expires_in: object) -> int:
+        """Parse a token's expires_in, falling back to the registry default."""
+        try:
+            ttl = int(expires_in)
+        except (TypeError, ValueError):
+            return Config.TOKEN_DEFAULT_TTL
+        return ttl if ttl > 0 else Config.TOKEN_DEFAULT_TTL
+
     @staticmethod
     def _parse_auth_header(header: Optional[str]) -> dict[str, str]:
         """Parse WWW-Authenticate header."""
@@ -276,14 +484,18 @@ class ImageRegistry:
         if scheme.lower() != "bearer":
             return {}
 
-        params = {}
-        for part in params_str.split(","):
-            if "=" not in part:
-                continue
-            key, value = part.split("=", 1)
-            params[key.strip()] = value.strip().strip('"')
+        return {
+            key: quoted or bare
+            for key, quoted, bare in ImageRegistry._AUTH_PARAM_RE.findall(params_str)
+        }
+
 
-        return params
+@functools.lru_cache(maxsize=4096)
+def _parse_name_set(value: str) -> frozenset[str]:
+    """Parse a comma-separated container name annotation into a set."""
+    return frozenset(
+        name for name in (part.strip() for part in value.split(",")) if name
+    )
 
 
 class ContainerSelector:
@@ -302,27 +514,38 @@ class ContainerSelector:
 
         if track:
             # Explicit whitelist
-            track_names = {name.strip() for name in track.split(",") if name.strip()}
+            track_names = _parse_name_set(track)
             return [c for c in containers if c.name in track_names]
 
         if ignore:
             # Blacklist
-            ignore_names = {name.strip() for name in ignore.split(",") if name.strip()}
+            ignore_names = _parse_name_set(ignore)
             return [c for c in containers if c.name not in ignore_names]
 
         # Track all
-        return containers
+        return list(containers)
 
 
 class WorkloadManager:
     """Manages Kubernetes workload resources."""
 
-    def __init__(self, apps_client: kubernetes.client.AppsV1Api):
+    _PATCH_METHODS = {
+        WorkloadKind.DEPLOYMENT: "patch_namespaced_deployment",
+        WorkloadKind.STATEFULSET: "patch_namespaced_stateful_set",
+        WorkloadKind.DAEMONSET: "patch_namespaced_daemon_set",
+    }
+
+    def __init__(
+        self,
+        apps_client: kubernetes.client.AppsV1Api,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ):
         self.apps = apps_client
+        self.executor = executor if executor is not None else _PATCH_POOL
 
     def update_digest_only(
         self, kind: WorkloadKind, name: str, namespace: str, digest_map: DigestMap
-    ) -> None:
+    ) -> Future:
         """Update digest annotation without triggering restart."""
         patch = {
             "metadata": {
@@ -332,13 +555,7 @@ class WorkloadManager:
             }
         }
 
-        # Apply patch based on workload type
-        if kind == WorkloadKind.DEPLOYMENT:
-            self.apps.patch_namespaced_deployment(name, namespace, patch)
-        elif kind == WorkloadKind.STATEFULSET:
-            self.apps.patch_namespaced_stateful_set(name, namespace, patch)
-        elif kind == WorkloadKind.DAEMONSET:
-            self.apps.patch_namespaced_daemon_set(name, namespace, patch)
+        return self._patch(kind, name, namespace, patch)
 
     def restart(
         self,
@@ -348,9 +565,9 @@ class WorkloadManager:
         digest_map: DigestMap,
         containers: list[ContainerInfo],
         force_pull_policy: bool = False,
-    ) -> None:
+    ) -> Future:
         """Restart workload with updated annotations."""
-        timestamp = datetime.datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+        timestamp = datetime.datetime.now(datetime.UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
 
         patch = {
             "metadata": {
@@ -382,13 +599,14 @@ class WorkloadManager:
                     ]
                 }
 
-        # Apply patch based on workload type
-        if kind == WorkloadKind.DEPLOYMENT:
-            self.apps.patch_namespaced_deployment(name, namespace, patch)
-        elif kind == WorkloadKind.STATEFULSET:
-            self.apps.patch_namespaced_stateful_set(name, namespace, patch)
-        elif kind == WorkloadKind.DAEMONSET:
-            self.apps.patch_namespaced_daemon_set(name, namespace, patch)
+        return self._patch(kind, name, namespace, patch)
+
+    def _patch(
+        self, kind: WorkloadKind, name: str, namespace: str, patch: dict
+    ) -> Future:
+        """Submit a patch for the workload type to the patch pool."""
+        method = getattr(self.apps, self._PATCH_METHODS[kind])
+        return self.executor.submit(method, name, namespace, patch)
 
 
 class ImageUpdateReconciler:
@@ -406,34 +624,28 @@ class ImageUpdateReconciler:
         self.container_selector = container_selector
         self.logger = logger
 
-    def reconcile(
-        self, kind: WorkloadKind, name: str, namespace: str, spec: dict, metadata: dict
+    async def reconcile(
+        self, kind: WorkloadKind, name: str, namespace: str, snapshot: WorkloadSnapshot
     ) -> None:
         """Check for image updates and restart workload if needed."""
-        # Extract containers from spec
-        template = spec.get("template", {})
-        pod_spec = template.get("spec", {})
-
-        containers = self._parse_containers(pod_spec.get("containers", []))
-        init_containers = self._parse_containers(pod_spec.get("initContainers", []))
-
+        containers = snapshot.containers
         if not containers:
             return
 
-        annotations = metadata.get("annotations", {})
+        annotations = snapshot.annotations
 
         # Select containers to track
         tracked = self.container_selector.select(containers, annotations)
 
         # Include init containers if requested
         if annotations.get(Config.TRACK_INIT_CONTAINERS_ANNOTATION) == "true":
-            tracked.extend(init_containers)
+            tracked.extend(snapshot.init_containers)
 
         if not tracked:
             return
 
         # Fetch current digests
-        current_digests = self._fetch_digests(tracked, kind, name, namespace)
+        current_digests = await self._fetch_digests(tracked, kind, name, namespace)
         if current_digests is None:
             return  # Failed to fetch some digests
 
@@ -454,16 +666,41 @@ class ImageUpdateReconciler:
             self.logger.info(
                 f"{kind.value}/{namespace}/{name}: image(s) changed → restarting"
             )
-            self.workload_manager.restart(
-                kind=kind,
-                name=name,
-                namespace=namespace,
-                digest_map=current_digests,
-                containers=containers,
-                force_pull_policy=Config.FORCE_PULL_POLICY,
+            # Patches run on the patch pool; awaiting keeps failures visible to
+            # kopf so its error handling and retry backoff apply
+            await asyncio.wrap_future(
+                self.workload_manager.restart(
+                    kind=kind,
+                    name=name,
+                    namespace=namespace,
+                    digest_map=current_digests,
+                    containers=containers,
+                    force_pull_policy=Config.FORCE_PULL_POLICY,
+                )
             )
 
-    def _parse_containers(self, container_list: list[dict]) -> list[ContainerInfo]:
+    @classmethod
+    def snapshot(cls, spec: dict, metadata: dict) -> WorkloadSnapshot:
+        """Parse the parts of a workload that reconciliation depends on."""
+        pod_spec = spec.get("template", {}).get("spec", {})
+        # Only our own annotations matter; unrelated ones (often large, like
+        # last-applied-configuration) are dropped before they reach the index
+        annotations = {
+            key: value
+            for key, value in metadata.get("annotations", {}).items()
+            if Config.owns_annotation(key)
+        }
+
+        return WorkloadSnapshot(
+            containers=tuple(cls._parse_containers(pod_spec.get("containers", []))),
+            init_containers=tuple(
+                cls._parse_containers(pod_spec.get("initContainers", []))
+            ),
+            annotations=annotations,
+        )
+
+    @staticmethod
+    def _parse_containers(container_list: list[dict]) -> list[ContainerInfo]:
         """Parse container specs into ContainerInfo objects."""
         return [
             ContainerInfo(
@@ -475,7 +712,7 @@ class ImageUpdateReconciler:
             if "name" in c and "image" in c
         ]
 
-    def _fetch_digests(
+    async def _fetch_digests(
         self,
         containers: list[ContainerInfo],
         kind: WorkloadKind,
@@ -485,17 +722,37 @@ class ImageUpdateReconciler:
         """Fetch digests for all containers, returning None if any fail."""
         digests = {}
         failed = []
+        lookups = []
 
         for container in containers:
             try:
                 image_ref = ImageReference.parse(container.image)
-                digest = self.registry.get_digest(image_ref)
-                digests[container.name] = digest
-            except (DigestFetchError, ValueError) as e:
-                self.logger.warning(
-                    f"Failed to fetch digest for {container.name} ({container.image}): {e}"
-                )
+            except ValueError as e:
+                self._log_fetch_failure(container, e)
+                failed.append(container.name)
+                continue
+
+            if image_ref.digest:
+                # Digest-pinned images are immutable, no registry lookup needed
+                digests[container.name] = image_ref.digest
+            elif (cached := self.registry.cached_digest(image_ref)) is not None:
+                digests[container.name] = cached
+            else:
+                lookups.append((container, image_ref))
+
+        results = await asyncio.gather(
+            *(self.registry.get_digest(image_ref) for _, image_ref in lookups),
+            return_exceptions=True,
+        )
+
+        for (container, _), result in zip(lookups, results):
+            if isinstance(result, DigestFetchError):
+                self._log_fetch_failure(container, result)
                 failed.append(container.name)
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                digests[container.name] = result
 
         if failed:
             self.logger.info(
@@ -505,6 +762,11 @@ class ImageUpdateReconciler:
 
         return DigestMap(digests)
 
+    def _log_fetch_failure(self, container: ContainerInfo, error: Exception) -> None:
+        """Log a container whose digest could not be resolved."""
+        self.logger.warning(
+            f"Failed to fetch digest for {container.name} ({container.image}): {error}"
+        )
 
 
 def create_kubernetes_client() -> kubernetes.client.AppsV1Api:
@@ -533,6 +795,30 @@ def create_reconciler(logger: Logger) -> ImageUpdateReconciler:
     )
 
 
+async def reconcile_indexed(
+    kind: WorkloadKind,
+    name: str,
+    namespace: str,
+    index: kopf.Index,
+    logger: Logger,
+) -> None:
+    """Reconcile a workload from its indexed snapshot instead of the raw body."""
+    reconciler = create_reconciler(logger)
+    for snapshot in index.get((namespace, name), []):
+        await reconciler.reconcile(kind, name, namespace, snapshot)
+
+
+@kopf.index(
+    "apps",
+    "v1",
+    "deployments",
+    annotations={Config.ENABLE_ANNOTATION: "true"},
+)
+async def deployment_index(spec, meta, name, namespace, **_):
+    """Index parsed pod templates of enabled Deployments."""
+    return {(namespace, name): ImageUpdateReconciler.snapshot(spec, meta)}
+
+
 @kopf.timer(
     "apps",
     "v1",
@@ -540,10 +826,22 @@ def create_reconciler(logger: Logger) -> ImageUpdateReconciler:
     interval=Config.CHECK_INTERVAL,
     annotations={Config.ENABLE_ANNOTATION: "true"},
 )
-def deployment_timer(spec, meta, name, namespace, logger, **_):
+async def deployment_timer(name, namespace, logger, deployment_index, **_):
     """Timer handler for Deployments."""
-    reconciler = create_reconciler(logger)
-    reconciler.reconcile(WorkloadKind.DEPLOYMENT, name, namespace, spec, meta)
+    await reconcile_indexed(
+        WorkloadKind.DEPLOYMENT, name, namespace, deployment_index, logger
+    )
+
+
+@kopf.index(
+    "apps",
+    "v1",
+    "statefulsets",
+    annotations={Config.ENABLE_ANNOTATION: "true"},
+)
+async def statefulset_index(spec, meta, name, namespace, **_):
+    """Index parsed pod templates of enabled StatefulSets."""
+    return {(namespace, name): ImageUpdateReconciler.snapshot(spec, meta)}
 
 
 @kopf.timer(
@@ -553,10 +851,22 @@ def deployment_timer(spec, meta, name, namespace, logger, **_):
     interval=Config.CHECK_INTERVAL,
     annotations={Config.ENABLE_ANNOTATION: "true"},
 )
-def statefulset_timer(spec, meta, name, namespace, logger, **_):
+async def statefulset_timer(name, namespace, logger, statefulset_index, **_):
     """Timer handler for StatefulSets."""
-    reconciler = create_reconciler(logger)
-    reconciler.reconcile(WorkloadKind.STATEFULSET, name, namespace, spec, meta)
+    await reconcile_indexed(
+        WorkloadKind.STATEFULSET, name, namespace, statefulset_index, logger
+    )
+
+
+@kopf.index(
+    "apps",
+    "v1",
+    "daemonsets",
+    annotations={Config.ENABLE_ANNOTATION: "true"},
+)
+async def daemonset_index(spec, meta, name, namespace, **_):
+    """Index parsed pod templates of enabled DaemonSets."""
+    return {(namespace, name): ImageUpdateReconciler.snapshot(spec, meta)}
 
 
 @kopf.timer(
@@ -566,10 +876,11 @@ def statefulset_timer(spec, meta, name, namespace, logger, **_):
     interval=Config.CHECK_INTERVAL,
     annotations={Config.ENABLE_ANNOTATION: "true"},
 )
-def daemonset_timer(spec, meta, name, namespace, logger, **_):
+async def daemonset_timer(name, namespace, logger, daemonset_index, **_):
     """Timer handler for DaemonSets."""
-    reconciler = create_reconciler(logger)
-    reconciler.reconcile(WorkloadKind.DAEMONSET, name, namespace, spec, meta)
+    await reconcile_indexed(
+        WorkloadKind.DAEMONSET, name, namespace, daemonset_index, logger
+    )
 
 
 @kopf.on.startup()
@@ -578,3 +889,9 @@ def startup(settings: kopf.OperatorSettings, logger, **_):
     settings.persistence.finalizer = "image-updater.eznix86.github.io/finalizer"
 
     logger.info("kubernetes-image-updater started")
+
+
+@kopf.on.cleanup()
+async def cleanup(logger, **_):
+    """Close pooled registry connections on shutdown."""
+    await _SESSION.aclose()
@@ -1,7 +1,7 @@
 """Tests for ContainerSelector service."""
 
 import pytest
-from controller import Config, ContainerInfo, ContainerSelector
+from controller import Config, ContainerInfo, ContainerSelector, _parse_name_set
 
 
 class TestContainerSelector:
@@ -101,3 +101,14 @@ class TestContainerSelector:
         """Test selecting from empty container list."""
         selected = ContainerSelector.select([], {})
         assert len(selected) == 0
+
+    def test_parsed_name_sets_are_cached(self, sample_containers):
+        """Test that identical annotation values reuse one parsed name set."""
+        annotations = {Config.TRACK_CONTAINERS_ANNOTATION: "nginx, sidecar"}
+        ContainerSelector.select(sample_containers, annotations)
+        hits = _parse_name_set.cache_info().hits
+
+        ContainerSelector.select(sample_containers, dict(annotations))
+
+        assert _parse_name_set.cache_info().hits == hits + 1
+        assert _parse_name_set("nginx, sidecar") == frozenset({"nginx", "sidecar"})
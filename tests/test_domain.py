@@ -10,41 +10,88 @@ from controller import (
 )
 
 
+# (image, expected components)
+IMAGE_REFERENCE_CASES = (
+    (
+        "nginx:latest",
+        {
+            "registry": "registry-1.docker.io",
+            "repository": "library/nginx",
+            "tag": "latest",
+        },
+    ),
+    (
+        "myregistry.io/myorg/app:v1.2.3",
+        {
+            "registry": "myregistry.io",
+            "repository": "myorg/app",
+            "tag": "v1.2.3",
+        },
+    ),
+    (
+        "localhost:5000/myapp:dev",
+        {"registry": "localhost:5000", "repository": "myapp", "tag": "dev"},
+    ),
+    (
+        "ghcr.io/owner/repo:tag",
+        {"registry": "ghcr.io", "repository": "owner/repo", "tag": "tag"},
+    ),
+    (
+        "quay.io/project/image:v1.0",
+        {"registry": "quay.io", "repository": "project/image", "tag": "v1.0"},
+    ),
+    (
+        "nginx",
+        {
+            "registry": "registry-1.docker.io",
+            "repository": "library/nginx",
+            "tag": "latest",
+        },
+    ),
+    (
+        "localhost:5000/myapp",
+        {"registry": "localhost:5000", "repository": "myapp", "tag": "latest"},
+    ),
+    (
+        "localhost/myapp:dev",
+        {"registry": "localhost", "repository": "myapp", "tag": "dev"},
+    ),
+    (
+        "localhostname/myapp:dev",
+        {
+            "registry": "registry-1.docker.io",
+            "repository": "localhostname/myapp",
+            "tag": "dev",
+        },
+    ),
+    (
+        "nginx@sha256:abc123",
+        {
+            "registry": "registry-1.docker.io",
+            "repository": "library/nginx",
+            "tag": "latest",
+            "digest": "sha256:abc123",
+        },
+    ),
+    (
+        "ghcr.io/owner/repo:v1@sha256:abc123",
+        {
+            "registry": "ghcr.io",
+            "repository": "owner/repo",
+            "tag": "v1",
+            "digest": "sha256:abc123",
+        },
+    ),
+)
+
+
 class TestImageReference:
     """Test ImageReference parsing functionality."""
 
     @pytest.mark.parametrize(
         "image,expected",
-        [
-            (
-                "nginx:latest",
-                {
-                    "registry": "registry-1.docker.io",
-                    "repository": "library/nginx",
-                    "tag": "latest",
-                },
-            ),
-            (
-                "myregistry.io/myorg/app:v1.2.3",
-                {
-                    "registry": "myregistry.io",
-                    "repository": "myorg/app",
-                    "tag": "v1.2.3",
-                },
-            ),
-            (
-                "localhost:5000/myapp:dev",
-                {"registry": "localhost:5000", "repository": "myapp", "tag": "dev"},
-            ),
-            (
-                "ghcr.io/owner/repo:tag",
-                {"registry": "ghcr.io", "repository": "owner/repo", "tag": "tag"},
-            ),
-            (
-                "quay.io/project/image:v1.0",
-                {"registry": "quay.io", "repository": "project/image", "tag": "v1.0"},
-            ),
-        ],
+        IMAGE_REFERENCE_CASES,
+        ids=[image for image, _ in IMAGE_REFERENCE_CASES],
     )
     def test_parse_image_references(self, image, expected):
         """Test parsing various image reference formats."""
@@ -52,6 +99,17 @@ class TestImageReference:
         assert ref.registry == expected["registry"]
         assert ref.repository == expected["repository"]
         assert ref.tag == expected["tag"]
+        assert ref.digest == expected.get("digest")
+
+    @pytest.mark.parametrize("image", ["", ":latest", "nginx:", "nginx@"])
+    def test_parse_invalid_image_references(self, image):
+        """Test that malformed image references are rejected."""
+        with pytest.raises(ValueError):
+            ImageReference.parse(image)
+
+    def test_parse_is_memoized(self):
+        """Test that repeated parses of one image string share a reference."""
+        assert ImageReference.parse("nginx:1.25") is ImageReference.parse("nginx:1.25")
 
     def test_image_reference_immutability(self):
         """Test that ImageReference is immutable."""
@@ -59,6 +117,14 @@ class TestImageReference:
         with pytest.raises(AttributeError):
             ref.registry = "other-registry"
 
+    def test_image_reference_interns_components(self):
+        """Test that references to one repository share interned strings."""
+        first = ImageReference.parse("ghcr.io/org/app:v1")
+        second = ImageReference.parse("ghcr.io/org/app:v2")
+        assert first.registry is second.registry
+        assert first.repository is second.repository
+        assert not hasattr(first, "__dict__")
+
 
 class TestContainerInfo:
     """Test ContainerInfo functionality."""
@@ -88,6 +154,13 @@ class TestContainerInfo:
         c3 = ContainerInfo(name="nginx", image="nginx:latest")
         assert c3.needs_pull_policy_update is True
 
+    def test_container_info_immutability(self):
+        """Test that ContainerInfo is frozen and slotted."""
+        container = ContainerInfo(name="nginx", image="nginx:latest")
+        with pytest.raises(AttributeError):
+            container.image = "nginx:1.25"
+        assert not hasattr(container, "__dict__")
+
 
 class TestDigestMap:
     """Test DigestMap functionality."""
@@ -108,6 +181,10 @@ class TestDigestMap:
             ),
             ("sha256:legacy123", {"__legacy__": "sha256:legacy123"}),  # Legacy format
             ("sha384:legacy456", {"__legacy__": "sha384:legacy456"}),  # Legacy format
+            (
+                " nginx : sha256:abc123 ,broken,:sha256:x,sidecar:,",
+                {"nginx": "sha256:abc123"},
+            ),  # Whitespace and malformed entries
         ],
     )
     def test_from_annotation(self, annotation, expected):
@@ -158,6 +235,37 @@ class TestDigestMap:
         new = DigestMap({"nginx": "sha256:abc"})
         assert old.has_changed(new) is True
 
+        # Leftover legacy entry is not treated as a removed container
+        old = DigestMap({"__legacy__": "sha256:abc", "nginx": "sha256:abc"})
+        new = DigestMap({"nginx": "sha256:abc"})
+        assert old.has_changed(new) is False
+
+        # Same container count but a different container
+        old = DigestMap({"nginx": "sha256:abc"})
+        new = DigestMap({"worker": "sha256:abc"})
+        assert old.has_changed(new) is True
+
+        # Leftover legacy entry does not mask a changed digest
+        old = DigestMap({"__legacy__": "sha256:abc", "nginx": "sha256:abc"})
+        new = DigestMap({"nginx": "sha256:new"})
+        assert old.has_changed(new) is True
+
+    def test_digest_map_immutability(self):
+        """Test that DigestMap is immutable and precomputes its sorted items."""
+        dm = DigestMap({"sidecar": "sha256:def", "nginx": "sha256:abc"})
+        assert dm.items == (("nginx", "sha256:abc"), ("sidecar", "sha256:def"))
+        with pytest.raises(AttributeError):
+            dm.digests = {}
+        with pytest.raises(TypeError):
+            dm.digests["nginx"] = "sha256:new"
+
+        source = {"nginx": "sha256:abc"}
+        dm = DigestMap(source)
+        source["nginx"] = "sha256:new"
+        assert dm.digests == {"nginx": "sha256:abc"}
+        assert dm.to_annotation() == "nginx:sha256:abc"
+        assert not hasattr(dm, "__dict__")
+
     def test_migrate_legacy(self):
         """Test legacy digest migration."""
         # Legacy digest
@@ -190,19 +298,17 @@ class TestConfig:
 
     def test_config_constants(self):
         """Test that config constants are properly defined."""
-        assert Config.ENABLE_ANNOTATION.startswith("image-updater.eznix86.github.io")
-        assert Config.LAST_DIGEST_ANNOTATION.startswith(
-            "image-updater.eznix86.github.io"
-        )
-        assert Config.TRACK_CONTAINERS_ANNOTATION.startswith(
-            "image-updater.eznix86.github.io"
-        )
-        assert Config.IGNORE_CONTAINERS_ANNOTATION.startswith(
-            "image-updater.eznix86.github.io"
-        )
-        assert Config.TRACK_INIT_CONTAINERS_ANNOTATION.startswith(
-            "image-updater.eznix86.github.io"
+        owned = (
+            Config.ENABLE_ANNOTATION,
+            Config.LAST_DIGEST_ANNOTATION,
+            Config.TRACK_CONTAINERS_ANNOTATION,
+            Config.IGNORE_CONTAINERS_ANNOTATION,
+            Config.TRACK_INIT_CONTAINERS_ANNOTATION,
         )
+        for annotation in owned:
+            assert annotation.startswith("image-updater.eznix86.github.io/")
+            assert Config.owns_annotation(annotation)
+        assert not Config.owns_annotation(Config.RESTART_ANNOTATION)
         assert Config.RESTART_ANNOTATION == "kubectl.kubernetes.io/restartedAt"
 
     def test_config_defaults(self):
@@ -212,3 +318,4 @@ class TestConfig:
         assert Config.CHECK_INTERVAL > 0
         assert isinstance(Config.FORCE_PULL_POLICY, bool)
         assert len(Config.OCI_ACCEPT_TYPES) > 0
+        assert Config.OCI_ACCEPT_HEADER == ", ".join(Config.OCI_ACCEPT_TYPES)
@@ -1,6 +1,16 @@
 """Basic tests for ImageRegistry service."""
 
-from controller import ImageRegistry
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import httpx
+import pytest
+from controller import Config, DigestFetchError, ImageReference, ImageRegistry
+
+
+def _manifest_response(digest: str) -> Mock:
+    """Build a fake manifest response carrying a digest header."""
+    return Mock(headers={"Docker-Content-Digest": digest})
 
 
 class TestImageRegistryBasic:
@@ -17,6 +27,16 @@ class TestImageRegistryBasic:
         registry = ImageRegistry(timeout=30)
         assert registry.timeout == 30
 
+    def test_init_shares_default_session(self):
+        """Test that registries reuse the pooled module-level session."""
+        assert ImageRegistry().session is ImageRegistry().session
+
+    def test_init_custom_session(self):
+        """Test ImageRegistry initialization with an injected session."""
+        session = httpx.AsyncClient()
+        registry = ImageRegistry(session=session)
+        assert registry.session is session
+
     def test_parse_auth_header_bearer(self):
         """Test parsing Bearer authentication header."""
         registry = ImageRegistry()
@@ -29,6 +49,17 @@ class TestImageRegistryBasic:
             "scope": "repository:nginx:pull",
         }
 
+    def test_parse_auth_header_quoted_commas(self):
+        """Test that quoted values keep their commas and bare values are accepted."""
+        header = 'Bearer realm="https://ghcr.io/token",scope="repository:org/app:pull,push",error=insufficient_scope'
+        params = ImageRegistry._parse_auth_header(header)
+
+        assert params == {
+            "realm": "https://ghcr.io/token",
+            "scope": "repository:org/app:pull,push",
+            "error": "insufficient_scope",
+        }
+
     def test_parse_auth_header_non_bearer(self):
         """Test parsing non-Bearer authentication header."""
         registry = ImageRegistry()
@@ -43,3 +74,218 @@ class TestImageRegistryBasic:
         params = registry._parse_auth_header(None)
 
         assert params == {}
+
+    def test_get_digest_cached_within_ttl(self):
+        """Test that repeated lookups for the same tag hit the cache."""
+        registry = ImageRegistry()
+        ref = ImageReference.parse("nginx:latest")
+
+        with patch.object(
+            registry, "_fetch_manifest", return_value=_manifest_response("sha256:a")
+        ) as fetch:
+            assert asyncio.run(registry.get_digest(ref)) == "sha256:a"
+            assert asyncio.run(registry.get_digest(ref)) == "sha256:a"
+
+        assert fetch.call_count == 1
+
+    def test_get_digest_refetches_after_ttl(self):
+        """Test that expired cache entries are fetched again."""
+        registry = ImageRegistry()
+        registry._cache_ttl = 0
+        ref = ImageReference.parse("nginx:latest")
+
+        with patch.object(
+            registry,
+            "_fetch_manifest",
+            side_effect=[
+                _manifest_response("sha256:a"),
+                _manifest_response("sha256:b"),
+            ],
+        ) as fetch:
+            assert asyncio.run(registry.get_digest(ref)) == "sha256:a"
+            assert asyncio.run(registry.get_digest(ref)) == "sha256:b"
+
+        assert fetch.call_count == 2
+
+    def test_get_digest_revalidates_with_etag(self):
+        """Test that expired entries are revalidated with If-None-Match."""
+        registry = ImageRegistry()
+        registry._cache_ttl = 0
+        ref = ImageReference.parse("nginx:latest")
+        first = Mock(
+            status_code=200,
+            headers={"Docker-Content-Digest": "sha256:a", "ETag": '"sha256:a"'},
+        )
+
+        with patch.object(
+            registry,
+            "_fetch_manifest",
+            side_effect=[first, Mock(status_code=304, headers={})],
+        ) as fetch:
+            assert asyncio.run(registry.get_digest(ref)) == "sha256:a"
+            assert asyncio.run(registry.get_digest(ref)) == "sha256:a"
+
+        assert fetch.call_args_list[0].args == (ref, None)
+        assert fetch.call_args_list[1].args == (ref, '"sha256:a"')
+
+    def test_get_digest_cache_is_bounded(self, monkeypatch):
+        """Test that the least recently used entry is evicted when full."""
+        monkeypatch.setattr(Config, "DIGEST_CACHE_SIZE", 2)
+        registry = ImageRegistry()
+
+        with patch.object(
+            registry, "_fetch_manifest", return_value=_manifest_response("sha256:a")
+        ):
+            for image in ("a:1", "b:1", "c:1"):
+                asyncio.run(registry.get_digest(ImageReference.parse(image)))
+
+        assert [key[1] for key in registry._cache] == ["library/b", "library/c"]
+
+    def test_get_digest_deduplicates_concurrent_lookups(self):
+        """Test that concurrent lookups of one tag issue a single request."""
+        registry = ImageRegistry()
+        ref = ImageReference.parse("nginx:latest")
+
+        async def lookup_concurrently():
+            release = asyncio.Event()
+
+            async def fetch(*_):
+                await release.wait()
+                return _manifest_response("sha256:a")
+
+            with patch.object(
+                registry, "_fetch_manifest", side_effect=fetch
+            ) as fetch_mock:
+                lookups = asyncio.gather(*(registry.get_digest(ref) for _ in range(4)))
+                await asyncio.sleep(0)
+                release.set()
+                return await lookups, fetch_mock.call_count
+
+        results, call_count = asyncio.run(lookup_concurrently())
+
+        assert results == ["sha256:a"] * 4
+        assert call_count == 1
+        assert registry._inflight == {}
+
+    def test_get_digest_failure_is_not_cached(self):
+        """Test that a failed lookup is retried on the next call."""
+        registry = ImageRegistry()
+        ref = ImageReference.parse("nginx:latest")
+
+        async def lookup_twice():
+            with pytest.raises(DigestFetchError):
+                await registry.get_digest(ref)
+            return await registry.get_digest(ref)
+
+        with patch.object(
+            registry,
+            "_fetch_manifest",
+            side_effect=[
+                httpx.ConnectError("down"),
+                _manifest_response("sha256:a"),
+            ],
+        ):
+            assert asyncio.run(lookup_twice()) == "sha256:a"
+
+        assert registry._inflight == {}
+
+    def test_bearer_token_invalid_expires_in(self):
+        """Test that a malformed expires_in keeps the token with the default TTL."""
+        session = Mock(
+            get=AsyncMock(
+                return_value=Mock(
+                    json=Mock(return_value={"token": "t", "expires_in": "soon"})
+                )
+            )
+        )
+        registry = ImageRegistry(session=session)
+        header = 'Bearer realm="https://auth.example.io/token"'
+        key = ("auth.example.io", "repository:app:pull")
+
+        assert asyncio.run(registry._get_bearer_token(header, key)) == "t"
+        assert key in registry._tokens
+
+    def test_bearer_token_cache_is_pruned(self, monkeypatch):
+        """Test that expired tokens are dropped and the token cache is bounded."""
+        monkeypatch.setattr(Config, "TOKEN_CACHE_SIZE", 2)
+        ok = Mock(status_code=200, headers={"Docker-Content-Digest": "sha256:a"})
+        session = Mock(head=AsyncMock(return_value=ok))
+        registry = ImageRegistry(session=session)
+        registry._tokens[("registry-1.docker.io", "repository:library/nginx:pull")] = (
+            "stale",
+            0.0,
+        )
+
+        asyncio.run(registry.get_digest(ImageReference.parse("nginx:latest")))
+        assert registry._tokens == {}
+        assert "Authorization" not in session.head.call_args.kwargs["headers"]
+
+        for repo in ("a", "b", "c"):
+            session.get = AsyncMock(
+                return_value=Mock(json=Mock(return_value={"token": repo}))
+            )
+            asyncio.run(
+                registry._get_bearer_token(
+                    'Bearer realm="https://auth.example.io/token"', ("reg.io", repo)
+                )
+            )
+        assert list(registry._tokens) == [("reg.io", "b"), ("reg.io", "c")]
+
+    def test_get_digest_invalid_registry_port(self):
+        """Test that a malformed registry host surfaces as DigestFetchError."""
+        registry = ImageRegistry(session=httpx.AsyncClient())
+        ref = ImageReference.parse("reg.io:abc/app:v1")
+
+        with pytest.raises(DigestFetchError, match="Invalid port"):
+            asyncio.run(registry.get_digest(ref))
+
+        assert registry._inflight == {}
+
+    def test_bearer_token_invalid_realm(self):
+        """Test that a malformed token realm is treated as no token."""
+        registry = ImageRegistry(session=httpx.AsyncClient())
+        header = 'Bearer realm="https://auth.io:abc/token"'
+
+        token = asyncio.run(
+            registry._get_bearer_token(header, ("auth.io", "repository:app:pull"))
+        )
+
+        assert token is None
+
+    def test_get_digest_pinned_reference(self):
+        """Test that digest-pinned references are returned without a request."""
+        registry = ImageRegistry()
+        ref = ImageReference.parse("nginx@sha256:pinned")
+
+        with patch.object(registry, "_fetch_manifest") as fetch:
+            assert asyncio.run(registry.get_digest(ref)) == "sha256:pinned"
+
+        fetch.assert_not_called()
+
+    def test_bearer_token_reused_until_expiry(self):
+        """Test that a cached token is sent up front instead of re-challenging."""
+        challenge = Mock(
+            status_code=401,
+            headers={
+                "WWW-Authenticate": 'Bearer realm="https://auth.example.io/token"'
+            },
+        )
+        ok = Mock(status_code=200, headers={"Docker-Content-Digest": "sha256:a"})
+        session = Mock(
+            head=AsyncMock(side_effect=[challenge, ok, ok]),
+            get=AsyncMock(
+                return_value=Mock(
+                    json=Mock(return_value={"token": "t", "expires_in": 300})
+                )
+            ),
+        )
+        registry = ImageRegistry(session=session)
+        registry._cache_ttl = 0
+        ref = ImageReference.parse("nginx:latest")
+
+        assert asyncio.run(registry.get_digest(ref)) == "sha256:a"
+        assert asyncio.run(registry.get_digest(ref)) == "sha256:a"
+
+        assert session.get.await_count == 1
+        assert session.head.await_count == 3
+        assert session.head.call_args.kwargs["headers"]["Authorization"] == "Bearer t"
@@ -1,9 +1,13 @@
 """Simplified integration tests for ImageUpdateReconciler."""
 
-import pytest
+import asyncio
+from concurrent.futures import Future
 from unittest.mock import Mock
+
+import pytest
 from controller import (
     ContainerInfo,
+    DigestFetchError,
     WorkloadKind,
     ImageUpdateReconciler,
     ImageRegistry,
@@ -15,26 +19,47 @@ from controller import (
 class TestImageUpdateReconcilerSimplified:
     """Simplified tests for ImageUpdateReconciler focusing on core logic."""
 
-    @pytest.fixture
-    def mock_logger(self):
+    @pytest.fixture(scope="class")
+    @classmethod
+    def mock_logger(cls):
         """Create mock logger."""
         return Mock()
 
-    @pytest.fixture
-    def mock_registry(self):
+    @pytest.fixture(scope="class")
+    @classmethod
+    def mock_registry(cls):
         """Create mock registry."""
         return Mock(spec=ImageRegistry)
 
-    @pytest.fixture
-    def mock_workload_manager(self):
+    @pytest.fixture(scope="class")
+    @classmethod
+    def mock_workload_manager(cls):
         """Create mock workload manager."""
         return Mock(spec=WorkloadManager)
 
-    @pytest.fixture
-    def mock_container_selector(self):
+    @pytest.fixture(scope="class")
+    @classmethod
+    def mock_container_selector(cls):
         """Create mock container selector."""
         return Mock(spec=ContainerSelector)
 
+    @pytest.fixture(autouse=True)
+    def reset_mocks(
+        self, mock_logger, mock_registry, mock_workload_manager, mock_container_selector
+    ):
+        """Reset the shared mocks so each test starts from a clean slate."""
+        for mock in (
+            mock_logger,
+            mock_registry,
+            mock_workload_manager,
+            mock_container_selector,
+        ):
+            mock.reset_mock(return_value=True, side_effect=True)
+        mock_registry.cached_digest.return_value = None
+        patched = Future()
+        patched.set_result(None)
+        mock_workload_manager.restart.return_value = patched
+
     @pytest.fixture
     def reconciler(
         self, mock_registry, mock_workload_manager, mock_container_selector, mock_logger
@@ -72,12 +97,141 @@ class TestImageUpdateReconcilerSimplified:
             ContainerInfo(name="sidecar", image="myapp:v1"),
         ]
 
-        mock_registry.get_digest.side_effect = ["sha256:nginx", "sha256:sidecar"]
+        digests = {"library/nginx": "sha256:nginx", "library/myapp": "sha256:sidecar"}
+        mock_registry.get_digest.side_effect = lambda ref: digests[ref.repository]
 
-        result = reconciler._fetch_digests(
-            containers, WorkloadKind.DEPLOYMENT, "test", "default"
+        result = asyncio.run(
+            reconciler._fetch_digests(
+                containers, WorkloadKind.DEPLOYMENT, "test", "default"
+            )
         )
 
         assert result is not None
         assert result.digests == {"nginx": "sha256:nginx", "sidecar": "sha256:sidecar"}
         assert mock_registry.get_digest.call_count == 2
+
+    def test_fetch_digests_partial_failure(self, reconciler, mock_registry):
+        """Test that any failed lookup aborts the whole digest map."""
+        containers = [
+            ContainerInfo(name="nginx", image="nginx:latest"),
+            ContainerInfo(name="sidecar", image="myapp:v1"),
+        ]
+
+        def get_digest(ref):
+            if ref.repository == "library/myapp":
+                raise DigestFetchError("boom")
+            return "sha256:nginx"
+
+        mock_registry.get_digest.side_effect = get_digest
+
+        result = asyncio.run(
+            reconciler._fetch_digests(
+                containers, WorkloadKind.DEPLOYMENT, "test", "default"
+            )
+        )
+
+        assert result is None
+        assert mock_registry.get_digest.call_count == 2
+
+    def test_fetch_digests_skips_pinned_images(self, reconciler, mock_registry):
+        """Test that digest-pinned images never reach the registry."""
+        containers = [
+            ContainerInfo(name="nginx", image="nginx:latest"),
+            ContainerInfo(name="sidecar", image="myapp:v1@sha256:pinned"),
+        ]
+
+        mock_registry.get_digest.return_value = "sha256:nginx"
+
+        result = asyncio.run(
+            reconciler._fetch_digests(
+                containers, WorkloadKind.DEPLOYMENT, "test", "default"
+            )
+        )
+
+        assert result.digests == {"nginx": "sha256:nginx", "sidecar": "sha256:pinned"}
+        mock_registry.get_digest.assert_called_once()
+
+    def test_fetch_digests_uses_registry_cache(self, reconciler, mock_registry):
+        """Test that digests already cached by the registry skip the lookup."""
+        containers = [
+            ContainerInfo(name="nginx", image="nginx:latest"),
+            ContainerInfo(name="sidecar", image="myapp:v1"),
+        ]
+
+        mock_registry.cached_digest.side_effect = lambda ref: (
+            "sha256:nginx" if ref.repository == "library/nginx" else None
+        )
+        mock_registry.get_digest.return_value = "sha256:sidecar"
+
+        result = asyncio.run(
+            reconciler._fetch_digests(
+                containers, WorkloadKind.DEPLOYMENT, "test", "default"
+            )
+        )
+
+        assert result.digests == {"nginx": "sha256:nginx", "sidecar": "sha256:sidecar"}
+        mock_registry.get_digest.assert_called_once()
+
+    def test_fetch_digests_invalid_image(self, reconciler, mock_registry):
+        """Test that an unparsable image aborts the digest map."""
+        containers = [ContainerInfo(name="nginx", image="nginx:")]
+
+        result = asyncio.run(
+            reconciler._fetch_digests(
+                containers, WorkloadKind.DEPLOYMENT, "test", "default"
+            )
+        )
+
+        assert result is None
+        mock_registry.get_digest.assert_not_called()
+
+    def test_reconcile_raises_patch_failure(
+        self, reconciler, mock_registry, mock_workload_manager, mock_container_selector
+    ):
+        """Test that a failed restart patch propagates to kopf."""
+        mock_container_selector.select.side_effect = ContainerSelector.select
+        mock_registry.get_digest.return_value = "sha256:new"
+        failed = Future()
+        failed.set_exception(RuntimeError("patch rejected"))
+        mock_workload_manager.restart.return_value = failed
+        snapshot = reconciler.snapshot(
+            {
+                "template": {
+                    "spec": {"containers": [{"name": "nginx", "image": "nginx:latest"}]}
+                }
+            },
+            {},
+        )
+
+        with pytest.raises(RuntimeError, match="patch rejected"):
+            asyncio.run(
+                reconciler.reconcile(
+                    WorkloadKind.DEPLOYMENT, "test", "default", snapshot
+                )
+            )
+
+    def test_snapshot(self, reconciler):
+        """Test parsing a workload spec into an indexable snapshot."""
+        spec = {
+            "template": {
+                "spec": {
+                    "containers": [{"name": "nginx", "image": "nginx:latest"}],
+                    "initContainers": [{"name": "migrate", "image": "myapp:v1"}],
+                }
+            }
+        }
+        metadata = {
+            "annotations": {
+                "a": "b",
+                "image-updater.eznix86.github.io/enabled": "true",
+            }
+        }
+
+        snapshot = reconciler.snapshot(spec, metadata)
+
+        assert [c.name for c in snapshot.containers] == ["nginx"]
+        assert [c.name for c in snapshot.init_containers] == ["migrate"]
+        assert snapshot.annotations == {
+            "image-updater.eznix86.github.io/enabled": "true"
+        }
+        assert snapshot == reconciler.snapshot(spec, metadata)
@@ -0,0 +1,96 @@
+"""Tests for WorkloadManager service."""
+
+import re
+from unittest.mock import Mock
+
+import pytest
+from controller import (
+    Config,
+    ContainerInfo,
+    DigestMap,
+    WorkloadKind,
+    WorkloadManager,
+)
+
+
+class TestWorkloadManager:
+    """Test WorkloadManager patch generation."""
+
+    @pytest.fixture
+    def apps(self):
+        """Create mock AppsV1Api client."""
+        return Mock()
+
+    @pytest.fixture
+    def manager(self, apps):
+        """Create workload manager with a mocked client."""
+        return WorkloadManager(apps)
+
+    def test_restart_patches_digest_and_timestamp(self, manager, apps):
+        """Test that restart writes digests and a second-precision UTC timestamp."""
+        manager.restart(
+            kind=WorkloadKind.DEPLOYMENT,
+            name="web",
+            namespace="default",
+            digest_map=DigestMap({"nginx": "sha256:abc"}),
+            containers=[ContainerInfo(name="nginx", image="nginx:latest")],
+        ).result()
+
+        name, namespace, patch = apps.patch_namespaced_deployment.call_args.args
+        assert (name, namespace) == ("web", "default")
+        assert patch["metadata"]["annotations"] == {
+            Config.LAST_DIGEST_ANNOTATION: "nginx:sha256:abc"
+        }
+        timestamp = patch["spec"]["template"]["metadata"]["annotations"][
+            Config.RESTART_ANNOTATION
+        ]
+        assert re.fullmatch(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\dZ", timestamp)
+        assert "spec" not in patch["spec"]["template"]
+
+    def test_restart_forces_pull_policy(self, manager, apps):
+        """Test that restart sets imagePullPolicy only where it is not Always."""
+        manager.restart(
+            kind=WorkloadKind.STATEFULSET,
+            name="db",
+            namespace="default",
+            digest_map=DigestMap({"db": "sha256:abc"}),
+            containers=[
+                ContainerInfo(name="db", image="postgres:16"),
+                ContainerInfo(
+                    name="exporter", image="exp:1", image_pull_policy="Always"
+                ),
+            ],
+            force_pull_policy=True,
+        ).result()
+
+        patch = apps.patch_namespaced_stateful_set.call_args.args[2]
+        assert patch["spec"]["template"]["spec"] == {
+            "containers": [{"name": "db", "imagePullPolicy": "Always"}]
+        }
+
+    def test_update_digest_only(self, manager, apps):
+        """Test that digest-only updates leave the pod template alone."""
+        manager.update_digest_only(
+            WorkloadKind.DAEMONSET, "agent", "kube-system", DigestMap({"a": "sha256:1"})
+        ).result()
+
+        apps.patch_namespaced_daemon_set.assert_called_once_with(
+            "agent",
+            "kube-system",
+            {
+                "metadata": {
+                    "annotations": {Config.LAST_DIGEST_ANNOTATION: "a:sha256:1"}
+                }
+            },
+        )
+
+    def test_patch_failure_surfaces_on_future(self, manager, apps):
+        """Test that API errors are reported through the returned future."""
+        apps.patch_namespaced_deployment.side_effect = RuntimeError("conflict")
+
+        future = manager.update_digest_only(
+            WorkloadKind.DEPLOYMENT, "web", "default", DigestMap({})
+        )
+
+        with pytest.raises(RuntimeError):
+            future.result()